@@ -4,6 +4,7 @@ import json
 
 import streamlit as st
 
+from a11y_bot.report_renderer import format_line_range, render_sarif_report
 from a11y_bot.reviewer import build_professor_report, review_markdown_accessibility
 
 DEFAULT_MODEL = "gpt-4o-mini"
@@ -44,6 +45,7 @@ if st.button("Review Accessibility", type="primary"):
                     rules_text=rules_text,
                     model=model_name.strip() or DEFAULT_MODEL,
                     temperature=temperature,
+                    path=markdown_file.name,
                 )
                 report_text = build_professor_report(result)
 
@@ -64,6 +66,7 @@ if st.button("Review Accessibility", type="primary"):
                         "id": issue.id,
                         "severity": issue.severity,
                         "title": issue.title,
+                        "lines": format_line_range(issue) if issue.line_start is not None else "",
                     }
                     for issue in result.issues
                 ]
@@ -102,6 +105,12 @@ if st.button("Review Accessibility", type="primary"):
                 file_name="accessibility_review.json",
                 mime="application/json",
             )
+            st.download_button(
+                label="Download SARIF (Optional)",
+                data=render_sarif_report(markdown_file.name, result),
+                file_name="accessibility_review.sarif",
+                mime="application/sarif+json",
+            )
             with st.expander("Technical JSON (Optional)"):
                 st.code(output_json, language="json")
 
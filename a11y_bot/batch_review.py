@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol
+
+from openai import OpenAI
+
+from a11y_bot.reviewer import (
+    SYSTEM_PROMPT,
+    build_review_prompt,
+    parse_review_response,
+    review_markdown_accessibility,
+)
+from a11y_bot.schemas import AccessibilityReviewResponse
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchBackend(Protocol):
+    def submit(self, batch_file: Path) -> str: ...
+
+    def status(self, batch_id: str) -> str: ...
+
+    def fetch_results(self, batch_id: str) -> List[dict]: ...
+
+
+class OpenAIBatchBackend:
+    """Submits batch job files through the OpenAI Batch API."""
+
+    def __init__(self, client: Optional[OpenAI] = None) -> None:
+        if client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError("OPENAI_API_KEY is not set.")
+            client = OpenAI(api_key=api_key)
+        self.client = client
+
+    def submit(self, batch_file: Path) -> str:
+        with batch_file.open("rb") as handle:
+            uploaded = self.client.files.create(file=handle, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def fetch_results(self, batch_id: str) -> List[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines: List[dict] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(_read_jsonl(self.client.files.content(file_id).text))
+        return lines
+
+
+class LocalBatchBackend:
+    """
+    Local stand-in for the Batch API.
+
+    Runs each request of a batch file synchronously through chat completions
+    and stores the output in the same JSONL format the Batch API returns.
+    """
+
+    def __init__(self, work_dir: Path, client: Optional[OpenAI] = None) -> None:
+        self.work_dir = Path(work_dir)
+        self.client = client
+
+    def submit(self, batch_file: Path) -> str:
+        client = self.client or OpenAIBatchBackend().client
+        batch_id = f"local-{batch_file.stem}"
+        output_lines = []
+        for request in _read_jsonl(batch_file.read_text(encoding="utf-8")):
+            try:
+                response = client.chat.completions.create(**request["body"])
+                output_lines.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": response.model_dump()},
+                        "error": None,
+                    }
+                )
+            except Exception as exc:
+                output_lines.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"message": str(exc)},
+                    }
+                )
+        _write_jsonl(self._output_path(batch_id), output_lines)
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if self._output_path(batch_id).exists() else "failed"
+
+    def fetch_results(self, batch_id: str) -> List[dict]:
+        output_path = self._output_path(batch_id)
+        if not output_path.exists():
+            return []
+        return _read_jsonl(output_path.read_text(encoding="utf-8"))
+
+    def _output_path(self, batch_id: str) -> Path:
+        return self.work_dir / f"{batch_id}.output.jsonl"
+
+
+def review_markdown_accessibility_batch(
+    documents: Dict[str, str],
+    rules_text: Optional[str],
+    model: str,
+    temperature: float = 0.2,
+    *,
+    work_dir: str = "./a11y_bot/batch",
+    backend: Optional[BatchBackend] = None,
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+) -> tuple[list[tuple[str, AccessibilityReviewResponse]], list[tuple[str, str]]]:
+    """
+    Review many Markdown documents through a batch job instead of one request each.
+
+    Every request is keyed by a hash of its full content (model, temperature and prompts),
+    so reruns reuse cached results and pending batches instead of paying twice.
+
+    Args:
+        documents: Dict where key is filename and value is Markdown text.
+        rules_text: Optional custom accessibility rules.
+        model: OpenAI model name.
+        temperature: Sampling temperature for consistency.
+        work_dir: Directory holding batch files, submission state and cached results.
+        backend: Batch backend to use. Defaults to the OpenAI Batch API.
+        poll_interval: Seconds to wait between status checks.
+        timeout: Optional maximum number of seconds to wait for pending batches.
+
+    Returns:
+        Tuple of (filename, result) pairs and (filename, error text) pairs, sorted by filename.
+    """
+    work_path = Path(work_dir).resolve()
+    results_path = work_path / "results"
+    results_path.mkdir(parents=True, exist_ok=True)
+    state = _load_state(work_path)
+    if backend is None:
+        backend = OpenAIBatchBackend()
+
+    per_file_results: list[tuple[str, AccessibilityReviewResponse]] = []
+    failed_files: list[tuple[str, str]] = []
+    requests_by_id: Dict[str, dict] = {}
+    files_by_id: Dict[str, List[str]] = {}
+
+    for file_name, markdown_text in sorted(documents.items(), key=lambda x: x[0].lower()):
+        if not (markdown_text or "").strip():
+            per_file_results.append(
+                (file_name, review_markdown_accessibility("", rules_text, model, temperature, path=file_name))
+            )
+            continue
+        request = _build_batch_request(markdown_text, rules_text, model, temperature)
+        requests_by_id[request["custom_id"]] = request
+        files_by_id.setdefault(request["custom_id"], []).append(file_name)
+
+    # Only submit requests that have neither a successful cached result nor a batch in flight.
+    to_submit = [
+        request
+        for custom_id, request in requests_by_id.items()
+        if not _has_cached_content(results_path / f"{custom_id}.json") and custom_id not in state["pending"]
+    ]
+    if to_submit:
+        batch_hash = hashlib.sha256(
+            "".join(sorted(r["custom_id"] for r in to_submit)).encode("utf-8")
+        ).hexdigest()[:16]
+        batch_file = work_path / f"batch-{batch_hash}.jsonl"
+        _write_jsonl(batch_file, to_submit)
+        batch_id = backend.submit(batch_file)
+        for request in to_submit:
+            state["pending"][request["custom_id"]] = batch_id
+        _save_state(work_path, state)
+
+    _wait_for_batches(
+        backend,
+        work_path,
+        state,
+        wanted=set(requests_by_id),
+        poll_interval=poll_interval,
+        timeout=timeout,
+    )
+
+    for custom_id, file_names in files_by_id.items():
+        cached = results_path / f"{custom_id}.json"
+        for file_name in file_names:
+            if not cached.exists():
+                failed_files.append((file_name, "Batch result is not available yet."))
+                continue
+            entry = json.loads(cached.read_text(encoding="utf-8"))
+            if entry.get("error"):
+                failed_files.append((file_name, entry["error"]))
+                continue
+            try:
+                result = parse_review_response(entry["content"], documents[file_name], path=file_name)
+                per_file_results.append((file_name, result))
+            except Exception as exc:
+                # Drop output that does not parse or validate so the next run resubmits it.
+                cached.unlink(missing_ok=True)
+                failed_files.append((file_name, str(exc)))
+
+    per_file_results.sort(key=lambda x: x[0].lower())
+    failed_files.sort(key=lambda x: x[0].lower())
+    return per_file_results, failed_files
+
+
+def _build_batch_request(
+    markdown_text: str,
+    rules_text: Optional[str],
+    model: str,
+    temperature: float,
+) -> dict:
+    body = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_review_prompt(markdown_text, rules_text)},
+        ],
+    }
+    custom_id = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS_URL, "body": body}
+
+
+def _wait_for_batches(
+    backend: BatchBackend,
+    work_path: Path,
+    state: dict,
+    *,
+    wanted: set,
+    poll_interval: float,
+    timeout: Optional[float],
+) -> None:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        batch_ids = {b for c, b in state["pending"].items() if c in wanted}
+        if not batch_ids:
+            return
+
+        for batch_id in sorted(batch_ids):
+            status = backend.status(batch_id)
+            if status not in TERMINAL_STATUSES:
+                continue
+            # Expired and cancelled batches still bill, and return, the requests that finished.
+            _store_results(work_path, backend.fetch_results(batch_id))
+            # Anything from a finished batch that produced no result is resubmitted on the next run.
+            state["pending"] = {c: b for c, b in state["pending"].items() if b != batch_id}
+            _save_state(work_path, state)
+
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        if any(b in batch_ids for b in state["pending"].values()):
+            time.sleep(poll_interval)
+
+
+def _has_cached_content(cached: Path) -> bool:
+    """True if a successful model response is cached; failed requests are retried on the next run."""
+    if not cached.exists():
+        return False
+    return not json.loads(cached.read_text(encoding="utf-8")).get("error")
+
+
+def _store_results(work_path: Path, lines: List[dict]) -> None:
+    for line in lines:
+        custom_id = line.get("custom_id")
+        if not custom_id:
+            continue
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = (line.get("error") or {}).get("message") or f"Batch request failed: {response}"
+            entry = {"error": error}
+        else:
+            choices = response.get("body", {}).get("choices") or [{}]
+            entry = {"content": (choices[0].get("message") or {}).get("content") or ""}
+        (work_path / "results" / f"{custom_id}.json").write_text(json.dumps(entry), encoding="utf-8")
+
+
+def _load_state(work_path: Path) -> dict:
+    state_path = work_path / "state.json"
+    if state_path.exists():
+        return json.loads(state_path.read_text(encoding="utf-8"))
+    return {"pending": {}}
+
+
+def _save_state(work_path: Path, state: dict) -> None:
+    state_path = work_path / "state.json"
+    tmp_path = state_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp_path.replace(state_path)
+
+
+def _read_jsonl(text: str) -> List[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _write_jsonl(path: Path, lines: List[dict]) -> None:
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+
+
+def _save_to_results_store(
+    db_path: str,
+    documents: Dict[str, str],
+    rules_text: Optional[str],
+    model: str,
+    results: list[tuple[str, AccessibilityReviewResponse]],
+) -> None:
+    from a11y_bot.results_store import ResultsStore, RunInfo, content_hash
+
+    run_info = RunInfo(
+        repo=os.getenv("GITHUB_REPOSITORY", "local"),
+        commit=os.getenv("GITHUB_SHA", "unknown"),
+        branch=os.getenv("GITHUB_REF_NAME"),
+    )
+    store = ResultsStore(db_path)
+    try:
+        for file_name, result in results:
+            store.save_review(run_info, file_name, content_hash(documents[file_name], rules_text), model, result)
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch accessibility audit of every Markdown file in a tree.")
+    parser.add_argument("root", help="Directory to scan for .md files")
+    parser.add_argument("--rules", help="Optional rules file (.md or .txt)")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--temperature", type=float, default=0.2)
+    parser.add_argument("--work-dir", default="./a11y_bot/batch")
+    parser.add_argument("--output-dir", default="./a11y_bot")
+    parser.add_argument("--poll-interval", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--local", action="store_true", help="Use the local stand-in instead of the Batch API")
+    parser.add_argument("--results-db", default=os.getenv("A11Y_RESULTS_DB"), help="Optional results store to record scores in")
+    args = parser.parse_args(argv)
+
+    from a11y_bot.bot_reporter import write_accessibility_report
+
+    root = Path(args.root)
+    documents = {
+        path.relative_to(root).as_posix(): path.read_text(encoding="utf-8", errors="replace")
+        for path in sorted(root.rglob("*.md"))
+    }
+    rules_text = Path(args.rules).read_text(encoding="utf-8") if args.rules else None
+    backend = LocalBatchBackend(Path(args.work_dir)) if args.local else None
+
+    results, failed = review_markdown_accessibility_batch(
+        documents,
+        rules_text,
+        args.model,
+        args.temperature,
+        work_dir=args.work_dir,
+        backend=backend,
+        poll_interval=args.poll_interval,
+        timeout=args.timeout,
+    )
+    if args.results_db:
+        _save_to_results_store(args.results_db, documents, rules_text, args.model, results)
+    write_accessibility_report(results, failed, files_received=len(documents), output_dir=args.output_dir)
+    print(f"Reviewed {len(results)} files, {len(failed)} failed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Import-time benchmark for the CI entry point.
+
+Runs the no-op path of `a11y_bot.check_diff` in a fresh interpreter and fails
+if it takes too long or imports the heavy review dependencies.
+
+Usage: python -m a11y_bot.bench_startup [--budget-ms 150] [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HEAVY_MODULES = ("openai", "pydantic", "a11y_bot.reviewer", "a11y_bot.schemas")
+
+NOOP_DIFF = (
+    "diff --git a/script.py b/script.py\n"
+    "--- a/script.py\n"
+    "+++ b/script.py\n"
+    "@@ -1,1 +1,2 @@\n"
+    " print('hello')\n"
+    "+print('world')\n"
+    "diff --git a/chapter.md b/chapter.md\n"
+    "--- a/chapter.md\n"
+    "+++ b/chapter.md\n"
+    "@@ -1,1 +1,2 @@\n"
+    " # Title\n"
+    "+\n"
+)
+
+_PROBE = """
+import json, sys
+from a11y_bot.check_diff import analyze_diff
+analyze_diff(sys.argv[1], output_dir=sys.argv[2])
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def _run_once(diff_path: Path, output_dir: Path) -> tuple[float, list[str]]:
+    probe = _PROBE.format(heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", probe, str(diff_path), str(output_dir)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    return elapsed_ms, loaded
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        diff_path = tmp_dir / "pr.diff"
+        diff_path.write_text(NOOP_DIFF, encoding="utf-8")
+
+        timings = []
+        for _ in range(max(1, args.runs)):
+            elapsed_ms, loaded = _run_once(diff_path, tmp_dir)
+            if loaded:
+                print(f"FAIL: no-op path imported heavy modules: {', '.join(loaded)}")
+                return 1
+            timings.append(elapsed_ms)
+
+        if not (tmp_dir / "report.md").exists():
+            print("FAIL: no-op path did not write report.md")
+            return 1
+
+    best_ms = min(timings)
+    print(f"No-op path: best {best_ms:.1f} ms over {len(timings)} runs (budget {args.budget_ms:.0f} ms)")
+    if best_ms > args.budget_ms:
+        print("FAIL: no-op path exceeded its startup budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
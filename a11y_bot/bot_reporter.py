@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from collections import Counter
+import json
+import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
 
-from a11y_bot.reviewer import review_markdown_accessibility
-from a11y_bot.schemas import AccessibilityReviewResponse
+from a11y_bot.report_renderer import StreamingReportRenderer
+
+if TYPE_CHECKING:
+    from a11y_bot.results_store import ResultsStore, RunInfo
+    from a11y_bot.schemas import AccessibilityReviewResponse
 
 
 def generate_accessibility_pr_report(
@@ -16,6 +20,10 @@ def generate_accessibility_pr_report(
     model: str = "gpt-4o-mini",
     temperature: float = 0.2,
     output_dir: str = "./a11y_bot",
+    results_store: Optional[ResultsStore] = None,
+    run_info: Optional[RunInfo] = None,
+    line_numbers: Optional[Dict[str, List[int]]] = None,
+    file_texts: Optional[Dict[str, str]] = None,
 )-> None:
     """
     Run accessibility review for each modified file text and write a single Markdown report.
@@ -26,6 +34,11 @@ def generate_accessibility_pr_report(
         model: OpenAI model name.
         temperature: Sampling temperature for consistency.
         output_dir: Directory where the report file is written.
+        results_store: Optional store used to reuse, persist and compare results.
+        run_info: Repo/commit/branch metadata for the results store.
+        line_numbers: Optional source line of each line of a file's text, used to anchor issues.
+        file_texts: Optional full text of each file in the PR, reviewed in full to compare
+            its score with the base branch.
 
     Returns:
         None. The report is always written to report.md in output_dir.
@@ -51,109 +64,299 @@ def generate_accessibility_pr_report(
         output_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
         return
 
-    per_file_results: list[tuple[str, AccessibilityReviewResponse]] = []
-    failed_files: list[tuple[str, str]] = []
+    with StreamingReportRenderer(output_dir, files_received=len(modified_files)) as renderer:
+        for file_name, result, error_text, base_score, file_score in _review_files(
+            modified_files,
+            rules_text=rules_text,
+            model=model,
+            temperature=temperature,
+            results_store=results_store,
+            run_info=run_info,
+            line_numbers=line_numbers,
+            file_texts=file_texts,
+        ):
+            if error_text is not None:
+                renderer.add_failure(file_name, error_text)
+            else:
+                renderer.add_result(file_name, result, base_score=base_score, file_score=file_score)
+
+
+def generate_accessibility_partial_results(
+    modified_files: Dict[str, str],
+    *,
+    shard: int,
+    total_shards: int,
+    reviewable: bool = True,
+    rules_text: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.2,
+    output_dir: str = "./a11y_bot",
+    results_store: Optional[ResultsStore] = None,
+    run_info: Optional[RunInfo] = None,
+    line_numbers: Optional[Dict[str, List[int]]] = None,
+    file_texts: Optional[Dict[str, str]] = None,
+) -> Path:
+    """
+    Review one shard's files and write its partial results for a later merge.
+
+    Args:
+        modified_files: The files assigned to this shard, keyed by filename.
+        shard: 1-based index of this shard.
+        total_shards: Total number of shards the PR was split into.
+        reviewable: Whether the PR as a whole had any reviewable changes.
+        rules_text: Optional custom accessibility rules.
+        model: OpenAI model name.
+        temperature: Sampling temperature for consistency.
+        output_dir: Directory where the partial results file is written.
+        results_store: Optional store used to reuse and compare results. It is only read:
+            each shard works on its own copy, so nothing written here would be kept.
+        run_info: Repo/commit/branch metadata for the results store.
+        line_numbers: Optional source line of each line of a file's text, used to anchor issues.
+        file_texts: Optional full text of each file in the PR, reviewed in full to compare
+            its score with the base branch.
+
+    Returns:
+        Path of the partial results file: a metadata line followed by one JSON line per
+        file, sorted by filename.
+    """
+    output_path = Path(output_dir).resolve() / partial_results_name(shard, total_shards)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with output_path.open("w", encoding="utf-8") as handle:
+        metadata = {
+            "shard": shard,
+            "total_shards": total_shards,
+            "files_received": len(modified_files),
+            "reviewable": reviewable,
+        }
+        handle.write(json.dumps(metadata) + "\n")
+        for file_name, result, error_text, base_score, file_score in _review_files(
+            modified_files,
+            rules_text=rules_text,
+            model=model,
+            temperature=temperature,
+            results_store=results_store,
+            run_info=run_info,
+            line_numbers=line_numbers,
+            file_texts=file_texts,
+            save_results=False,
+        ):
+            if error_text is not None:
+                record = {"path": file_name, "error": error_text}
+            else:
+                record = {
+                    "path": file_name,
+                    "result": result.model_dump(),
+                    "base_score": base_score,
+                    "file_score": file_score,
+                }
+            handle.write(json.dumps(record) + "\n")
+
+    return output_path
+
+
+def partial_results_name(shard: int, total_shards: int) -> str:
+    return f"partial-results-{shard}-of-{total_shards}.jsonl"
+
+
+def _review_files(
+    modified_files: Dict[str, str],
+    *,
+    rules_text: Optional[str],
+    model: str,
+    temperature: float,
+    results_store: Optional[ResultsStore],
+    run_info: Optional[RunInfo],
+    line_numbers: Optional[Dict[str, List[int]]],
+    file_texts: Optional[Dict[str, str]] = None,
+    save_results: bool = True,
+) -> Iterator[
+    tuple[str, Optional[AccessibilityReviewResponse], Optional[str], Optional[int], Optional[int]]
+]:
+    """
+    Yield (filename, result, error text, base-branch score, whole-file score) per file, sorted
+    by filename.
+
+    The result covers only the text in modified_files, usually the lines added in a diff. The
+    base branch records whole-file scores, so the two scores are only returned together,
+    and only when the full text of the file could be reviewed as well.
+    """
+    if not modified_files:
+        return
+
+    # Imported lazily so that the no-op path never pays for openai/pydantic.
+    from a11y_bot.results_store import content_hash
+    from a11y_bot.reviewer import review_markdown_accessibility
+
+    use_store = results_store is not None and run_info is not None
+    line_numbers = line_numbers or {}
+    file_texts = file_texts or {}
 
     for file_name, modified_text in sorted(modified_files.items(), key=lambda x: x[0].lower()):
+        result = None
+        file_lines = line_numbers.get(file_name)
+        text_hash = content_hash(modified_text, rules_text, file_lines)
+        if use_store:
+            result = _read_store(results_store.find_cached, text_hash, model, path=file_name)
+        if result is None:
+            try:
+                result = review_markdown_accessibility(
+                    markdown_text=modified_text or "",
+                    rules_text=rules_text,
+                    model=model,
+                    temperature=temperature,
+                    path=file_name,
+                    line_numbers=file_lines,
+                )
+            except Exception as exc:
+                yield file_name, None, str(exc), None, None
+                continue
+        if use_store and save_results:
+            _save_review(results_store, run_info, file_name, text_hash, model, result)
+
+        base_score = None
+        if use_store and run_info.base_branch:
+            base_scores = _read_store(
+                results_store.latest_scores, run_info.repo, run_info.base_branch, [file_name]
+            )
+            base_score = (base_scores or {}).get(file_name)
+
+        file_score = None
+        if base_score is not None and file_name in file_texts:
+            file_score = _whole_file_score(
+                file_name,
+                file_texts[file_name],
+                rules_text=rules_text,
+                model=model,
+                temperature=temperature,
+                results_store=results_store,
+                run_info=run_info,
+                save_results=save_results,
+            )
+        if file_score is None:
+            base_score = None
+        yield file_name, result, None, base_score, file_score
+
+
+def _whole_file_score(
+    file_name: str,
+    file_text: str,
+    *,
+    rules_text: Optional[str],
+    model: str,
+    temperature: float,
+    results_store: ResultsStore,
+    run_info: RunInfo,
+    save_results: bool,
+) -> Optional[int]:
+    """Score the full text of a file the way the default-branch audit does, reusing its results."""
+    from a11y_bot.results_store import content_hash
+    from a11y_bot.reviewer import review_markdown_accessibility
+
+    text_hash = content_hash(file_text, rules_text)
+    result = _read_store(results_store.find_cached, text_hash, model, path=file_name)
+    if result is None:
         try:
             result = review_markdown_accessibility(
-                markdown_text=modified_text or "",
+                markdown_text=file_text,
                 rules_text=rules_text,
                 model=model,
                 temperature=temperature,
+                path=file_name,
             )
-            per_file_results.append((file_name, result))
         except Exception as exc:
-            failed_files.append((file_name, str(exc)))
+            print(f"Whole-file review of {file_name} failed, skipping its base-branch delta: {exc}")
+            return None
+    if save_results:
+        _save_review(results_store, run_info, file_name, text_hash, model, result)
+    return result.score
 
-    lines.extend(_build_overview_section(per_file_results, failed_files))
 
-    for file_name, result in per_file_results:
-        lines.extend(_build_file_section(file_name, result))
+def _read_store(query, *args, **kwargs):
+    """Run a results store query; a broken store means no cached data, not a failed review."""
+    try:
+        return query(*args, **kwargs)
+    except sqlite3.Error as exc:
+        print(f"Results store query failed: {exc}")
+        return None
 
-    if failed_files:
-        lines.extend(["## Files With Review Errors", ""])
-        for file_name, error_text in failed_files:
-            lines.append(f"- `{file_name}`: {error_text}")
-        lines.append("")
 
-    output_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
-    return
-
-
-def _build_overview_section(
-    results: list[tuple[str, AccessibilityReviewResponse]],
-    failed_files: list[tuple[str, str]],
-) -> list[str]:
-    lines = ["## Overview", ""]
-    if not results:
-        lines.append("- No files were successfully reviewed.")
-        lines.append("")
-        return lines
-
-    total_files = len(results)
-    avg_score = round(sum(r.score for _, r in results) / total_files)
-    severity_counts = Counter()
-    total_issues = 0
-
-    for _, r in results:
-        total_issues += len(r.issues)
-        for issue in r.issues:
-            severity_counts[issue.severity] += 1
-
-    lines.extend(
-        [
-            f"- Successfully reviewed files: {total_files}",
-            f"- Files with review errors: {len(failed_files)}",
-            f"- Average score: {avg_score}/100",
-            f"- Total issues: {total_issues}",
-            (
-                "- Severity totals: "
-                f"high={severity_counts.get('high', 0)}, "
-                f"medium={severity_counts.get('medium', 0)}, "
-                f"low={severity_counts.get('low', 0)}"
-            ),
-            "",
-        ]
-    )
-    return lines
-
-
-def _build_file_section(file_name: str, result: AccessibilityReviewResponse) -> list[str]:
-    lines = [
-        f"## File: `{file_name}`",
-        "",
-        f"- Score: {result.score}/100",
-        "",
-        "### Summary",
-    ]
+def _save_review(
+    results_store: ResultsStore,
+    run_info: RunInfo,
+    file_name: str,
+    text_hash: str,
+    model: str,
+    result: AccessibilityReviewResponse,
+) -> None:
+    # The review is already paid for, so a locked or read-only store must not discard it.
+    try:
+        results_store.save_review(run_info, file_name, text_hash, model, result)
+    except sqlite3.Error as exc:
+        print(f"Could not save the review of {file_name} to the results store: {exc}")
+
 
-    for bullet in result.summary_bullets:
-        lines.append(f"- {bullet}")
-
-    lines.extend(["", "### Findings"])
-    if not result.issues:
-        lines.append("- No accessibility issues found.")
-    else:
-        for issue in result.issues:
-            lines.extend(
-                [
-                    f"- **{issue.id} | {issue.severity.upper()} | {issue.title}**",
-                    f"  - Why it matters: {issue.explanation}",
-                    f"  - Evidence: {issue.evidence}",
-                    f"  - Suggested fix: {issue.suggestion}",
-                ]
+def write_accessibility_report(
+    per_file_results: Iterable[tuple[str, AccessibilityReviewResponse]],
+    failed_files: Iterable[tuple[str, str]],
+    *,
+    files_received: int,
+    output_dir: str = "./a11y_bot",
+    base_scores: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Write report.md (plus details, JSON Lines and SARIF) from results produced elsewhere.
+
+    Args:
+        per_file_results: (filename, result) pairs for successfully reviewed files.
+        failed_files: (filename, error text) pairs for files whose review failed.
+        files_received: Number of files that were submitted for review.
+        output_dir: Directory where the report files are written.
+        base_scores: Optional latest base-branch score per filename, shown as deltas.
+
+    Returns:
+        None. The report is always written to report.md in output_dir.
+    """
+    base_scores = base_scores or {}
+
+    with StreamingReportRenderer(output_dir, files_received=files_received) as renderer:
+        for file_name, result in per_file_results:
+            # These are whole-file results, so they compare directly with the base branch.
+            renderer.add_result(
+                file_name,
+                result,
+                base_score=base_scores.get(file_name),
+                file_score=result.score,
             )
+        for file_name, error_text in failed_files:
+            renderer.add_failure(file_name, error_text)
 
-    lines.extend(["", "### Score Breakdown", f"- Base: {result.score_breakdown.base}"])
-    for penalty in result.score_breakdown.penalties:
-        lines.append(
-            f"- {penalty.severity.title()}: {penalty.count} x {penalty.penalty_per_item} = -{penalty.subtotal}"
-        )
-    lines.append(f"- Final: {result.score_breakdown.final}")
 
-    if result.applied_rules:
-        lines.extend(["", "### Applied Rules", f"- {result.applied_rules}"])
+def write_no_changes_report(
+    modified_files: Dict[str, str],
+    *,
+    output_dir: str = "./a11y_bot",
+) -> None:
+    """
+    Write a minimal report for a diff that has nothing to review.
 
-    lines.append("")
-    return lines
+    Args:
+        modified_files: Parsed diff, possibly containing Markdown files with only blank added lines.
+        output_dir: Directory where the report file is written.
+
+    Returns:
+        None. The report is always written to report.md in output_dir.
+    """
+    output_path = Path(output_dir).resolve() / "report.md"
+
+    lines = [
+        "# Accessibility PR Review",
+        "",
+        f"- Generated (UTC): {datetime.now(timezone.utc).isoformat(timespec='seconds')}",
+        f"- Files received: {len(modified_files)}",
+        "",
+        "## Summary",
+        "- No reviewable Markdown changes were found in this PR.",
+        "",
+    ]
+    output_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
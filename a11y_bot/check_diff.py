@@ -1,47 +1,226 @@
-import sys
+import argparse
+import hashlib
+import os
+import re
 
-from a11y_bot.bot_reporter import generate_accessibility_pr_report
+HUNK_HEADER_RE = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
 
-def parse_diff(diff_content):
-    """Parses a unified diff and returns a dictionary of added lines per file."""
+def parse_diff_lines(diff_content):
+    """Parses a unified diff and returns a dictionary of (new line number, text) pairs of added lines per file."""
     changed_files = {}
     current_file = None
+    new_line = 0
+    # Lines still to come in the current hunk; while any remain, "--- "/"+++ " lines are content
+    old_left = new_left = 0
+    previous = ''
     lines = diff_content.split('\n')
     
     for line in lines:
 
-        # Detect which file we are currently looking at
-        if line.startswith('+++ b/'):
-            current_file = line.replace('+++ b/', '')
+        if old_left > 0 or new_left > 0:
+            # If we are inside a markdown file and the line was ADDED
+            if line.startswith('+'):
+                # Remove the leading '+' to get the actual content
+                actual_content = line[1:]
+
+                if current_file and actual_content.strip():
+                    changed_files[current_file].append((new_line, actual_content))
+                new_line += 1
+                new_left -= 1
+
+            elif line.startswith('-'):
+                old_left -= 1
+
+            # Context lines exist in the new file too; "\ No newline" markers do not
+            elif not line.startswith('\\'):
+                new_line += 1
+                old_left -= 1
+                new_left -= 1
+
+        # Detect which file we are currently looking at; the header always follows the "--- " line
+        elif line.startswith('+++ ') and previous.startswith('--- '):
+            current_file = line[len('+++ b/'):] if line.startswith('+++ b/') else None
             # We only care about markdown files for accessibility checks
-            if current_file.endswith('.md'):
-                changed_files[current_file] = ""
+            if current_file and current_file.endswith('.md'):
+                changed_files[current_file] = []
             else:
-                current_file = None # Ignore non-markdown files
-                
-        # If we are inside a markdown file and the line was ADDED
-        elif current_file and line.startswith('+') and not line.startswith('+++'):
-            # Remove the leading '+' to get the actual content
-            actual_content = line[1:]
+                current_file = None # Ignore non-markdown and deleted files
+
+        # Hunk headers tell us the line number of the first line in the new file and the hunk size
+        elif line.startswith('@@'):
+            match = HUNK_HEADER_RE.match(line)
+            if match:
+                old_count, new_start, new_count = match.groups()
+                new_line = int(new_start)
+                old_left = int(old_count) if old_count is not None else 1
+                new_left = int(new_count) if new_count is not None else 1
 
-            if actual_content.strip(): 
-                changed_files[current_file] = changed_files[current_file] + "\n" + actual_content
+        previous = line
 
     return changed_files
 
-def analyze_diff(diff_file_path):
+def parse_diff(diff_content):
+    """Parses a unified diff and returns a dictionary of added lines per file."""
+    return _join_added_lines(parse_diff_lines(diff_content))
+
+def _join_added_lines(parsed_lines):
+    return {
+        file_name: "\n".join(text for _, text in added_lines)
+        for file_name, added_lines in parsed_lines.items()
+    }
+
+def has_reviewable_changes(parsed_changes):
+    """Returns True if at least one markdown file has non-blank added content."""
+    return any(text.strip() for text in parsed_changes.values())
+
+def shard_for_path(file_name, total_shards):
+    """Returns the 1-based shard of a file; stable across runs and independent of the other files in the diff."""
+    digest = hashlib.sha256(file_name.encode('utf-8')).hexdigest()
+    return int(digest[:16], 16) % total_shards + 1
+
+def parse_shard(value):
+    """Parses an "i/N" shard argument into (i, N) with 1 <= i <= N."""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected i/N with 1 <= i <= N")
+    return int(match.group(1)), int(match.group(2))
+
+def set_workflow_output(name, value):
+    # GitHub Actions exposes step outputs through the file named in GITHUB_OUTPUT
+    output_file = os.getenv('GITHUB_OUTPUT')
+    if output_file:
+        with open(output_file, 'a', encoding='utf-8') as file:
+            file.write(f"{name}={value}\n")
+
+def detect_reviewable_changes(diff_file_path):
+    """Sets the `reviewable` workflow output without reviewing anything, so CI can skip the review jobs."""
+    with open(diff_file_path, 'r', encoding='utf-8') as file:
+        reviewable = has_reviewable_changes(parse_diff(file.read()))
+    set_workflow_output('reviewable', str(reviewable).lower())
+    print(f"--- Reviewable Markdown changes: {'yes' if reviewable else 'no'} ---")
+    return reviewable
+
+def analyze_diff(diff_file_path, output_dir="./a11y_bot", shard=None):
     with open(diff_file_path, 'r', encoding='utf-8') as file:
         diff_content = file.read()
 
-    parsed_changes = parse_diff(diff_content)
+    parsed_lines = parse_diff_lines(diff_content)
+    parsed_changes = _join_added_lines(parsed_lines)
+    reviewable = has_reviewable_changes(parsed_changes)
+
+    if shard is not None:
+        shard_index, total_shards = shard
+        parsed_changes = {
+            file_name: text
+            for file_name, text in parsed_changes.items()
+            if shard_for_path(file_name, total_shards) == shard_index
+        }
+
+    if not has_reviewable_changes(parsed_changes):
+        # Fast path: skip the reviewer (and its openai/pydantic imports) entirely
+        print("--- No reviewable changes, skipping analyzer ---")
+        set_workflow_output('reviewable', str(reviewable).lower())
+        if shard is not None:
+            from a11y_bot.bot_reporter import generate_accessibility_partial_results
+
+            generate_accessibility_partial_results(
+                {},
+                shard=shard[0],
+                total_shards=shard[1],
+                reviewable=reviewable,
+                output_dir=output_dir,
+            )
+        else:
+            from a11y_bot.bot_reporter import write_no_changes_report
+
+            write_no_changes_report(parsed_changes, output_dir=output_dir)
+        return
+
+    from a11y_bot.bot_reporter import (
+        generate_accessibility_partial_results,
+        generate_accessibility_pr_report,
+    )
+
+    results_store, run_info = _open_results_store()
+    line_numbers = {
+        file_name: [number for number, _ in parsed_lines[file_name]]
+        for file_name in parsed_changes
+    }
+    # Base-branch scores cover whole files, so the delta needs the PR's version of each file
+    file_texts = None
+    if run_info is not None and run_info.base_branch:
+        file_texts = _read_checked_out_files(parsed_changes)
 
     print("--- Calling analyzer ---")
-    generate_accessibility_pr_report(parsed_changes)
+    set_workflow_output('reviewable', 'true')
+    try:
+        if shard is not None:
+            generate_accessibility_partial_results(
+                parsed_changes,
+                shard=shard[0],
+                total_shards=shard[1],
+                output_dir=output_dir,
+                results_store=results_store,
+                run_info=run_info,
+                line_numbers=line_numbers,
+                file_texts=file_texts,
+            )
+        else:
+            generate_accessibility_pr_report(
+                parsed_changes,
+                output_dir=output_dir,
+                results_store=results_store,
+                run_info=run_info,
+                line_numbers=line_numbers,
+                file_texts=file_texts,
+            )
+    finally:
+        if results_store is not None:
+            results_store.close()
+
+def _read_checked_out_files(file_names):
+    # Paths in the diff are relative to the repository root, which is where CI runs the bot
+    file_texts = {}
+    for file_name in file_names:
+        if os.path.isfile(file_name):
+            with open(file_name, 'r', encoding='utf-8', errors='replace') as file:
+                file_texts[file_name] = file.read()
+    return file_texts
+
+def _open_results_store():
+    # Results are only persisted when a database path is configured
+    db_path = os.getenv('A11Y_RESULTS_DB')
+    if not db_path:
+        return None, None
+
+    from a11y_bot.results_store import ResultsStore, RunInfo
+
+    run_info = RunInfo(
+        repo=os.getenv('GITHUB_REPOSITORY', 'local'),
+        commit=os.getenv('GITHUB_SHA', 'unknown'),
+        branch=os.getenv('GITHUB_HEAD_REF') or os.getenv('GITHUB_REF_NAME'),
+        base_branch=os.getenv('GITHUB_BASE_REF') or None,
+    )
+    return ResultsStore(db_path), run_info
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python check_diff.py <path_to_diff_file>")
-        sys.exit(1)
-        
-    diff_path = sys.argv[1]
-    analyze_diff(diff_path)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Review the Markdown changes of a PR diff for accessibility.")
+    parser.add_argument('diff_path', help="Path to the unified diff file")
+    parser.add_argument('--output-dir', default="./a11y_bot")
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        default=None,
+        help="Only review the files of shard i out of N (e.g. 2/4) and write partial results for merge_shards",
+    )
+    parser.add_argument(
+        '--detect',
+        action='store_true',
+        help="Only set the reviewable workflow output; needs no dependencies beyond the standard library",
+    )
+    args = parser.parse_args()
+
+    if args.detect:
+        detect_reviewable_changes(args.diff_path)
+    else:
+        analyze_diff(args.diff_path, output_dir=args.output_dir, shard=args.shard)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from a11y_bot.bot_reporter import partial_results_name, write_no_changes_report
+from a11y_bot.check_diff import (
+    has_reviewable_changes,
+    parse_diff,
+    set_workflow_output,
+    shard_for_path,
+)
+from a11y_bot.report_renderer import StreamingReportRenderer
+
+
+def merge_partial_results(
+    partial_paths: List[Path],
+    *,
+    output_dir: str = "./a11y_bot",
+    expected_shards: Optional[int] = None,
+    diff_path: Optional[str] = None,
+) -> bool:
+    """
+    Merge the partial results of a sharded review into one report.
+
+    Partials are merged in filename order without loading them all into memory, so the
+    overview averages and severity totals cover every shard. Files whose review failed in
+    any shard, and shards that produced no partial at all, are listed as review errors.
+
+    Args:
+        partial_paths: Partial results files written by `check_diff --shard`.
+        output_dir: Directory where the report files are written.
+        expected_shards: Number of shards the PR was split into. Defaults to the value
+            recorded in the partials.
+        diff_path: Optional PR diff, used to name the files of missing shards.
+
+    Returns:
+        True if the PR had reviewable changes and a full report was written.
+    """
+    metadata = [_read_metadata(path) for path in partial_paths]
+    total_shards = expected_shards or max((m["total_shards"] for m in metadata), default=0)
+    for path, meta in zip(partial_paths, metadata):
+        if meta["total_shards"] != total_shards:
+            raise RuntimeError(
+                f"{path} belongs to a {meta['total_shards']}-shard run, expected {total_shards} shards."
+            )
+
+    missing_shards = sorted(set(range(1, total_shards + 1)) - {m["shard"] for m in metadata})
+    missing_files = _files_in_shards(diff_path, missing_shards, total_shards)
+    if metadata:
+        # Every shard sees the whole diff, so any partial knows whether the PR had anything to review.
+        reviewable = any(m["reviewable"] for m in metadata)
+    elif diff_path:
+        reviewable = any(missing_files.values())
+    else:
+        reviewable = bool(missing_shards)
+
+    if not reviewable:
+        write_no_changes_report({}, output_dir=output_dir)
+        return False
+
+    files_received = sum(m["files_received"] for m in metadata) + sum(len(f) for f in missing_files.values())
+
+    with StreamingReportRenderer(output_dir, files_received=files_received) as renderer:
+        from a11y_bot.schemas import AccessibilityReviewResponse
+
+        records = heapq.merge(
+            *(_read_records(path) for path in partial_paths),
+            key=lambda record: record["path"].lower(),
+        )
+        for record in records:
+            if "error" in record:
+                renderer.add_failure(record["path"], record["error"])
+            else:
+                renderer.add_result(
+                    record["path"],
+                    AccessibilityReviewResponse.model_validate(record["result"]),
+                    base_score=record.get("base_score"),
+                    file_score=record.get("file_score"),
+                )
+
+        for shard in missing_shards:
+            error_text = f"Shard {shard}/{total_shards} produced no results (job failed or was cancelled)."
+            for file_name in missing_files.get(shard, [partial_results_name(shard, total_shards)]):
+                renderer.add_failure(file_name, error_text)
+
+    return True
+
+
+def _read_metadata(path: Path) -> dict:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.loads(handle.readline())
+
+
+def _read_records(path: Path) -> Iterator[dict]:
+    with path.open("r", encoding="utf-8") as handle:
+        handle.readline()
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _files_in_shards(
+    diff_path: Optional[str],
+    shards: List[int],
+    total_shards: int,
+) -> Dict[int, List[str]]:
+    """Map each missing shard to its reviewable files, when the diff is available."""
+    if not diff_path or not shards:
+        return {}
+
+    parsed_changes = parse_diff(Path(diff_path).read_text(encoding="utf-8"))
+    files: Dict[int, List[str]] = {shard: [] for shard in shards}
+    for file_name, text in sorted(parsed_changes.items(), key=lambda x: x[0].lower()):
+        shard = shard_for_path(file_name, total_shards)
+        if shard in files and has_reviewable_changes({file_name: text}):
+            files[shard].append(file_name)
+    return files
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge partial results of a sharded review into report.md.")
+    parser.add_argument("partials", nargs="+", help="Partial results files or directories containing them")
+    parser.add_argument("--output-dir", default="./a11y_bot")
+    parser.add_argument("--expected-shards", type=int, default=None)
+    parser.add_argument("--diff", default=None, help="PR diff, used to list the files of missing shards")
+    args = parser.parse_args(argv)
+
+    partial_paths: List[Path] = []
+    for entry in map(Path, args.partials):
+        if entry.is_dir():
+            partial_paths.extend(sorted(entry.glob("partial-results-*.jsonl")))
+        elif entry.exists():
+            partial_paths.append(entry)
+
+    reviewable = merge_partial_results(
+        partial_paths,
+        output_dir=args.output_dir,
+        expected_shards=args.expected_shards,
+        diff_path=args.diff,
+    )
+    set_workflow_output("reviewable", str(reviewable).lower())
+    print(f"Merged {len(partial_paths)} partial results into {Path(args.output_dir) / 'report.md'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
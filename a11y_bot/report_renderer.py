@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import json
+import re
+import shutil
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional, TextIO
+
+if TYPE_CHECKING:
+    from a11y_bot.schemas import AccessibilityReviewResponse
+
+# GitHub rejects comments over 65536 characters; leave headroom for the footer.
+GITHUB_COMMENT_LIMIT = 60000
+
+SARIF_LEVELS = {"high": "error", "medium": "warning", "low": "note"}
+
+# Cap on inline review comments per run so a large PR is not flooded.
+MAX_INLINE_COMMENTS = 50
+
+
+@dataclass
+class ReportTotals:
+    reviewed: int = 0
+    failed: int = 0
+    score_sum: int = 0
+    total_issues: int = 0
+    severity_counts: Counter = field(default_factory=Counter)
+
+    def add_result(self, result: AccessibilityReviewResponse) -> None:
+        self.reviewed += 1
+        self.score_sum += result.score
+        self.total_issues += len(result.issues)
+        for issue in result.issues:
+            self.severity_counts[issue.severity] += 1
+
+    def add_failure(self) -> None:
+        self.failed += 1
+
+    def overview_lines(self) -> list[str]:
+        lines = ["## Overview", ""]
+        if not self.reviewed:
+            lines.append("- No files were successfully reviewed.")
+            lines.append("")
+            return lines
+
+        avg_score = round(self.score_sum / self.reviewed)
+        lines.extend(
+            [
+                f"- Successfully reviewed files: {self.reviewed}",
+                f"- Files with review errors: {self.failed}",
+                f"- Average score: {avg_score}/100",
+                f"- Total issues: {self.total_issues}",
+                (
+                    "- Severity totals: "
+                    f"high={self.severity_counts.get('high', 0)}, "
+                    f"medium={self.severity_counts.get('medium', 0)}, "
+                    f"low={self.severity_counts.get('low', 0)}"
+                ),
+                "",
+            ]
+        )
+        return lines
+
+
+def file_section_lines(
+    heading: str,
+    result: AccessibilityReviewResponse,
+    *,
+    base_score: Optional[int] = None,
+    file_score: Optional[int] = None,
+    level: int = 2,
+) -> Iterator[str]:
+    """
+    Yield the Markdown lines describing one review result, starting with a heading of the given level.
+
+    base_score is the whole-file score on the base branch; it is only compared with
+    file_score, the whole-file score of the reviewed version, never with result.score.
+    """
+    h = "#" * level
+    yield from [f"{h} {heading}", "", f"- Score: {result.score}/100"]
+    if base_score is not None and file_score is not None:
+        yield f"- Whole file: {file_score}/100 ({file_score - base_score:+d} vs base branch: {base_score}/100)"
+
+    yield from ["", f"{h}# Summary"]
+    for bullet in result.summary_bullets:
+        yield f"- {bullet}"
+
+    yield from ["", f"{h}# Findings"]
+    if not result.issues:
+        yield "- No accessibility issues found."
+    else:
+        for issue in result.issues:
+            location = f" ({format_line_range(issue)})" if issue.line_start is not None else ""
+            yield from [
+                f"- **{issue.id} | {issue.severity.upper()} | {issue.title}**{location}",
+                f"  - Why it matters: {issue.explanation}",
+                f"  - Evidence: {issue.evidence}",
+                f"  - Suggested fix: {issue.suggestion}",
+            ]
+
+    yield from ["", f"{h}# Score Breakdown", f"- Base: {result.score_breakdown.base}"]
+    for penalty in result.score_breakdown.penalties:
+        yield f"- {penalty.severity.title()}: {penalty.count} x {penalty.penalty_per_item} = -{penalty.subtotal}"
+    yield f"- Final: {result.score_breakdown.final}"
+
+    if result.applied_rules:
+        yield from ["", f"{h}# Applied Rules", f"- {result.applied_rules}"]
+
+    yield ""
+
+
+def format_line_range(issue) -> str:
+    if issue.line_end is None or issue.line_end == issue.line_start:
+        return f"L{issue.line_start}"
+    return f"L{issue.line_start}-L{issue.line_end}"
+
+
+def sarif_results(file_name: str, result: AccessibilityReviewResponse) -> Iterator[dict]:
+    for issue in result.issues:
+        location = {"artifactLocation": {"uri": issue.path or file_name}}
+        if issue.line_start is not None:
+            location["region"] = {"startLine": issue.line_start, "endLine": issue.line_end or issue.line_start}
+        yield {
+            "ruleId": _rule_id(issue.title),
+            "level": SARIF_LEVELS.get(issue.severity, "note"),
+            "message": {
+                "text": f"{issue.title}: {issue.explanation} Suggested fix: {issue.suggestion}"
+            },
+            "locations": [{"physicalLocation": location}],
+            "properties": {"issueId": issue.id, "evidence": issue.evidence},
+        }
+
+
+def review_comments(file_name: str, result: AccessibilityReviewResponse) -> Iterator[dict]:
+    """Yield GitHub pull request review comments for the issues that are anchored to lines."""
+    for issue in result.issues:
+        if issue.line_start is None:
+            continue
+        # Single-line comments only: GitHub rejects ranges that span more than one hunk.
+        yield {
+            "path": issue.path or file_name,
+            "line": issue.line_start,
+            "side": "RIGHT",
+            "body": (
+                f"**{issue.severity.upper()} | {issue.title}** ({format_line_range(issue)})\n\n"
+                f"{issue.explanation}\n\nSuggested fix: {issue.suggestion}"
+            ),
+        }
+
+
+def _rule_id(title: str) -> str:
+    return "a11y/" + (re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "issue")
+
+
+class StreamingReportRenderer:
+    """
+    Write Markdown, JSON Lines and SARIF reports in a single pass over review results.
+
+    Per-file details are streamed to report-details.md, results.jsonl, report.sarif and
+    review-comments.json (inline PR review comments for line-anchored issues) as results
+    arrive. On close, report.md is assembled from the overview and either the full details
+    (if they fit in a GitHub comment) or a compact per-file summary and as many review
+    errors as fit; the complete list of errors is always kept in report-details.md.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "./a11y_bot",
+        *,
+        files_received: int,
+        title: str = "Accessibility PR Review",
+        comment_limit: int = GITHUB_COMMENT_LIMIT,
+    ) -> None:
+        self.output_dir = Path(output_dir).resolve()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.report_path = self.output_dir / "report.md"
+        self.details_path = self.output_dir / "report-details.md"
+        self.jsonl_path = self.output_dir / "results.jsonl"
+        self.sarif_path = self.output_dir / "report.sarif"
+        self.review_comments_path = self.output_dir / "review-comments.json"
+        self.title = title
+        self.files_received = files_received
+        self.comment_limit = comment_limit
+        self.totals = ReportTotals()
+
+        self._summary_path = self.output_dir / ".report-summary.tmp"
+        self._failures_path = self.output_dir / ".report-failures.tmp"
+        self._details = self.details_path.open("w", encoding="utf-8")
+        self._summary = self._summary_path.open("w+", encoding="utf-8")
+        self._failures = self._failures_path.open("w+", encoding="utf-8")
+        self._jsonl = self.jsonl_path.open("w", encoding="utf-8")
+        self._sarif = self.sarif_path.open("w", encoding="utf-8")
+        self._sarif_count = 0
+        self._sarif.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            '"runs": [{"tool": {"driver": {"name": "a11y-bot", "informationUri": '
+            '"https://github.com/SirbayC/AIGuildHackathon-Demo-MathQuantPhysics"}}, '
+            '"results": ['
+        )
+        self._review_comments = self.review_comments_path.open("w", encoding="utf-8")
+        self._review_comment_count = 0
+        self._review_comments.write(
+            '{"event": "COMMENT", '
+            '"body": "Line-level accessibility findings. See the PR comment for the full report.", '
+            '"comments": ['
+        )
+        _write_lines(self._details, [f"# {self.title} - Details", ""])
+
+    def __enter__(self) -> "StreamingReportRenderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_result(
+        self,
+        file_name: str,
+        result: AccessibilityReviewResponse,
+        *,
+        base_score: Optional[int] = None,
+        file_score: Optional[int] = None,
+    ) -> None:
+        self.totals.add_result(result)
+        _write_lines(
+            self._details,
+            file_section_lines(f"File: `{file_name}`", result, base_score=base_score, file_score=file_score),
+        )
+
+        counts = Counter(issue.severity for issue in result.issues)
+        delta = ""
+        if base_score is not None and file_score is not None:
+            delta = f" (whole file {file_score - base_score:+d})"
+        self._summary.write(
+            f"| `{file_name}` | {result.score}/100{delta} | "
+            f"{counts.get('high', 0)} | {counts.get('medium', 0)} | {counts.get('low', 0)} |\n"
+        )
+
+        record = {"path": file_name, "base_score": base_score, "file_score": file_score, **result.model_dump()}
+        self._jsonl.write(json.dumps(record) + "\n")
+
+        for sarif_result in sarif_results(file_name, result):
+            if self._sarif_count:
+                self._sarif.write(", ")
+            self._sarif.write(json.dumps(sarif_result))
+            self._sarif_count += 1
+
+        for comment in review_comments(file_name, result):
+            if self._review_comment_count >= MAX_INLINE_COMMENTS:
+                break
+            if self._review_comment_count:
+                self._review_comments.write(", ")
+            self._review_comments.write(json.dumps(comment))
+            self._review_comment_count += 1
+
+    def add_failure(self, file_name: str, error_text: str) -> None:
+        self.totals.add_failure()
+        # One line per file, so the compact list can count files (validation errors span lines).
+        self._failures.write(f"- `{file_name}`: {' '.join(error_text.split())}\n")
+        self._jsonl.write(json.dumps({"path": file_name, "error": error_text}) + "\n")
+
+    def close(self) -> None:
+        if self._details.closed:
+            return
+        self._sarif.write("]}]}\n")
+        self._review_comments.write("]}\n")
+        self._failures.seek(0)
+        if self.totals.failed:
+            _write_lines(self._details, ["## Files With Review Errors", ""])
+            shutil.copyfileobj(self._failures, self._details)
+        for handle in (self._details, self._jsonl, self._sarif, self._review_comments):
+            handle.close()
+
+        header = [
+            f"# {self.title}",
+            "",
+            f"- Generated (UTC): {datetime.now(timezone.utc).isoformat(timespec='seconds')}",
+            f"- Files received: {self.files_received}",
+            "",
+        ]
+        header.extend(self.totals.overview_lines())
+        head_text = "\n".join(header) + "\n"
+
+        details_size = self.details_path.stat().st_size
+        with self.report_path.open("w", encoding="utf-8") as report:
+            report.write(head_text)
+            budget = max(0, self.comment_limit - len(head_text))
+            if details_size <= budget:
+                self._copy_details(report)
+            else:
+                # Review errors get at most half the space so the score table is never crowded out.
+                failures_text = self._compact_failures(budget // 2)
+                self._write_compact_summary(report, budget - len(failures_text))
+                report.write(failures_text)
+
+        self._summary.close()
+        self._failures.close()
+        self._summary_path.unlink()
+        self._failures_path.unlink()
+
+        # Drop trailing blank lines so the file ends with exactly one newline.
+        text = self.report_path.read_text(encoding="utf-8")
+        self.report_path.write_text(text.strip() + "\n", encoding="utf-8")
+
+    def _copy_details(self, report: TextIO) -> None:
+        with self.details_path.open("r", encoding="utf-8") as details:
+            details.readline()
+            details.readline()
+            shutil.copyfileobj(details, report)
+
+    def _write_compact_summary(self, report: TextIO, budget: int) -> None:
+        intro = [
+            "## Per-File Scores",
+            "",
+            f"Full findings are in the `{self.details_path.name}` artifact "
+            f"(also `{self.jsonl_path.name}` and `{self.sarif_path.name}`).",
+            "",
+            "| File | Score | High | Medium | Low |",
+            "| --- | --- | --- | --- | --- |",
+        ]
+        intro_text = "\n".join(intro) + "\n"
+        report.write(intro_text)
+        budget -= len(intro_text) + 200
+
+        self._summary.seek(0)
+        written = 0
+        for row in self._summary:
+            if len(row) > budget:
+                remaining = self.totals.reviewed - written
+                report.write(f"\n- {remaining} more files omitted to fit the comment size limit.\n")
+                break
+            report.write(row)
+            budget -= len(row)
+            written += 1
+        report.write("\n")
+
+    def _compact_failures(self, budget: int) -> str:
+        if not self.totals.failed:
+            return ""
+        lines = ["## Files With Review Errors", ""]
+        budget -= len(lines[0]) + 200
+
+        self._failures.seek(0)
+        written = 0
+        for row in self._failures:
+            if len(row) > budget:
+                remaining = self.totals.failed - written
+                lines.append(f"\n- {remaining} more files with review errors are listed in `{self.details_path.name}`.")
+                break
+            lines.append(row.rstrip("\n"))
+            budget -= len(row)
+            written += 1
+        return "\n".join(lines) + "\n\n"
+
+
+def render_markdown_report(
+    heading: str,
+    result: AccessibilityReviewResponse,
+) -> str:
+    """Render a single review result as a standalone Markdown document."""
+    return "\n".join(file_section_lines(heading, result, level=1)).strip() + "\n"
+
+
+def render_sarif_report(file_name: str, result: AccessibilityReviewResponse) -> str:
+    """Render a single review result as a SARIF 2.1.0 document."""
+    document = {
+        "version": "2.1.0",
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "runs": [{"tool": {"driver": {"name": "a11y-bot"}}, "results": list(sarif_results(file_name, result))}],
+    }
+    return json.dumps(document, indent=2)
+
+
+def _write_lines(handle: TextIO, lines) -> None:
+    for line in lines:
+        handle.write(line)
+        handle.write("\n")
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from a11y_bot.schemas import AccessibilityReviewResponse
+
+DEFAULT_DB_PATH = "./a11y_bot/results.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    branch TEXT,
+    content_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    UNIQUE (repo, path, commit_sha, content_hash, model)
+);
+CREATE TABLE IF NOT EXISTS issues (
+    review_id INTEGER NOT NULL REFERENCES reviews(id) ON DELETE CASCADE,
+    issue_id TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    title TEXT NOT NULL,
+    explanation TEXT NOT NULL,
+    evidence TEXT NOT NULL,
+    suggestion TEXT NOT NULL,
+    path TEXT,
+    line_start INTEGER,
+    line_end INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_path ON reviews(repo, path, created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_branch ON reviews(repo, branch, path, created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_created_at ON reviews(created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_content ON reviews(content_hash, model);
+CREATE INDEX IF NOT EXISTS idx_issues_review ON issues(review_id);
+CREATE INDEX IF NOT EXISTS idx_issues_severity ON issues(severity);
+"""
+
+# Columns added after the first release, applied to databases created before them.
+ISSUE_COLUMN_MIGRATIONS = {
+    "path": "TEXT",
+    "line_start": "INTEGER",
+    "line_end": "INTEGER",
+}
+
+
+@dataclass
+class RunInfo:
+    repo: str
+    commit: str
+    branch: Optional[str] = None
+    base_branch: Optional[str] = None
+
+
+def content_hash(
+    markdown_text: str,
+    rules_text: Optional[str] = None,
+    line_numbers: Optional[List[int]] = None,
+) -> str:
+    """
+    Hash of everything that determines a review result apart from the model.
+
+    Whole files are hashed without line numbers, so batch audits and the whole-file reviews
+    of PR runs share keys; reviews of added lines include their line numbers.
+    """
+    lines = ",".join(str(n) for n in line_numbers) if line_numbers else ""
+    text = (rules_text or "") + "\0" + lines + "\0" + (markdown_text or "")
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultsStore:
+    """
+    SQLite-backed history of accessibility review results.
+
+    Rows hold whatever text was reviewed: full files for batch audits, added lines only for
+    PR reviews. CI persists the store from default-branch audits alone (see README).
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH) -> None:
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(issues)")}
+        with self.conn:
+            for column, column_type in ISSUE_COLUMN_MIGRATIONS.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE issues ADD COLUMN {column} {column_type}")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_issues_anchor ON issues(path, line_start)")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def save_review(
+        self,
+        run: RunInfo,
+        path: str,
+        text_hash: str,
+        model: str,
+        result: AccessibilityReviewResponse,
+    ) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO reviews (repo, path, commit_sha, branch, content_hash, model, score, created_at, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (repo, path, commit_sha, content_hash, model) DO UPDATE SET
+                    branch = excluded.branch,
+                    score = excluded.score,
+                    created_at = excluded.created_at,
+                    payload = excluded.payload
+                """,
+                (
+                    run.repo,
+                    path,
+                    run.commit,
+                    run.branch,
+                    text_hash,
+                    model,
+                    result.score,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    result.model_dump_json(),
+                ),
+            )
+            review_id = self.conn.execute(
+                """
+                SELECT id FROM reviews
+                WHERE repo = ? AND path = ? AND commit_sha = ? AND content_hash = ? AND model = ?
+                """,
+                (run.repo, path, run.commit, text_hash, model),
+            ).fetchone()["id"]
+            self.conn.execute("DELETE FROM issues WHERE review_id = ?", (review_id,))
+            self.conn.executemany(
+                """
+                INSERT INTO issues (
+                    review_id, issue_id, severity, title, explanation, evidence, suggestion,
+                    path, line_start, line_end
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        review_id,
+                        issue.id,
+                        issue.severity,
+                        issue.title,
+                        issue.explanation,
+                        issue.evidence,
+                        issue.suggestion,
+                        issue.path or path,
+                        issue.line_start,
+                        issue.line_end,
+                    )
+                    for issue in result.issues
+                ],
+            )
+
+    def find_cached(
+        self,
+        text_hash: str,
+        model: str,
+        path: Optional[str] = None,
+    ) -> Optional[AccessibilityReviewResponse]:
+        """
+        Return the most recent result for identical content and model, if any.
+
+        The content may have been reviewed under another file name; pass `path` to anchor
+        the returned issues to the file being reviewed now.
+        """
+        from a11y_bot.schemas import AccessibilityReviewResponse
+
+        row = self.conn.execute(
+            "SELECT payload FROM reviews WHERE content_hash = ? AND model = ? ORDER BY created_at DESC LIMIT 1",
+            (text_hash, model),
+        ).fetchone()
+        if row is None:
+            return None
+        result = AccessibilityReviewResponse.model_validate_json(row["payload"])
+        if path is not None:
+            result.issues = [issue.model_copy(update={"path": path}) for issue in result.issues]
+        return result
+
+    def latest_scores(self, repo: str, branch: str, paths: List[str]) -> Dict[str, int]:
+        """Return the latest recorded score on a branch for each of the given paths."""
+        scores: Dict[str, int] = {}
+        for path in paths:
+            row = self.conn.execute(
+                """
+                SELECT score FROM reviews
+                WHERE repo = ? AND branch = ? AND path = ?
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (repo, branch, path),
+            ).fetchone()
+            if row is not None:
+                scores[path] = row["score"]
+        return scores
+
+    def score_history(self, path: str, repo: Optional[str] = None) -> List[dict]:
+        rows = self.conn.execute(
+            """
+            SELECT r.repo, r.commit_sha, r.branch, r.model, r.score, r.created_at,
+                   SUM(i.severity = 'high') AS high,
+                   SUM(i.severity = 'medium') AS medium,
+                   SUM(i.severity = 'low') AS low
+            FROM reviews r LEFT JOIN issues i ON i.review_id = r.id
+            WHERE r.path = ? AND (? IS NULL OR r.repo = ?)
+            GROUP BY r.id
+            ORDER BY r.created_at
+            """,
+            (path, repo, repo),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def worst_offenders(
+        self,
+        limit: int = 10,
+        repo: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> List[dict]:
+        """Return files ordered by their latest score, lowest first."""
+        rows = self.conn.execute(
+            """
+            SELECT r.repo, r.path, r.score, r.commit_sha, r.created_at,
+                   (SELECT COUNT(*) FROM issues i WHERE i.review_id = r.id AND i.severity = 'high') AS high
+            FROM reviews r
+            WHERE r.id = (
+                SELECT r2.id FROM reviews r2
+                WHERE r2.repo = r.repo AND r2.path = r.path
+                ORDER BY r2.created_at DESC, r2.id DESC LIMIT 1
+            )
+            AND (? IS NULL OR r.repo = ?)
+            AND (? IS NULL OR r.created_at >= ?)
+            ORDER BY r.score ASC, high DESC, r.path
+            LIMIT ?
+            """,
+            (repo, repo, since, since, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query stored accessibility review results.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--repo", default=None)
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    history = commands.add_parser("history", help="Score history of one file")
+    history.add_argument("path")
+
+    worst = commands.add_parser("worst", help="Files with the lowest latest score")
+    worst.add_argument("--limit", type=int, default=10)
+    worst.add_argument("--since", default=None, help="Only include reviews from this ISO date onwards")
+
+    args = parser.parse_args(argv)
+    if not Path(args.db).exists():
+        print(f"No results database at {args.db}")
+        return 1
+
+    store = ResultsStore(args.db)
+    try:
+        if args.command == "history":
+            rows = store.score_history(args.path, repo=args.repo)
+        else:
+            rows = store.worst_offenders(limit=args.limit, repo=args.repo, since=args.since)
+    finally:
+        store.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    elif args.command == "history":
+        for row in rows:
+            print(
+                f"{row['created_at']}  {row['commit_sha'][:10]}  {row['score']:>3}/100  "
+                f"high={row['high'] or 0} medium={row['medium'] or 0} low={row['low'] or 0}"
+            )
+    else:
+        for row in rows:
+            print(f"{row['score']:>3}/100  high={row['high']}  {row['path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
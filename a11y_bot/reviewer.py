@@ -2,16 +2,22 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from openai import OpenAI
 from pydantic import ValidationError
 
+from a11y_bot.report_renderer import render_markdown_report
 from a11y_bot.schemas import AccessibilityReviewResponse
 from a11y_bot.utils import (
+    anchor_issues,
+    compact_markdown,
     ensure_score_breakdown,
+    local_accessibility_issues,
     normalize_issue_ids,
+    number_lines,
     parse_markdown_structure,
+    resolve_line_numbers,
     truncate_text,
     try_parse_json,
 )
@@ -25,43 +31,7 @@ SYSTEM_PROMPT = (
 
 
 def build_professor_report(result: AccessibilityReviewResponse) -> str:
-    lines = [
-        "# Accessibility Review Report",
-        "",
-        f"## Overall Score: {result.score}/100",
-        "",
-        "## Quick Summary",
-    ]
-
-    for bullet in result.summary_bullets:
-        lines.append(f"- {bullet}")
-
-    lines.extend(["", "## Findings"])
-    if not result.issues:
-        lines.append("- No accessibility issues were identified in this review.")
-    else:
-        for issue in result.issues:
-            lines.extend(
-                [
-                    f"### {issue.id} - {issue.title} ({issue.severity.upper()})",
-                    f"Why it matters: {issue.explanation}",
-                    f"Evidence: {issue.evidence}",
-                    f"Suggested fix: {issue.suggestion}",
-                    "",
-                ]
-            )
-
-    lines.extend(["## Scoring Details", f"- Base score: {result.score_breakdown.base}"])
-    for p in result.score_breakdown.penalties:
-        lines.append(
-            f"- {p.severity.title()}: {p.count} x {p.penalty_per_item} = -{p.subtotal}"
-        )
-    lines.append(f"- Final score: {result.score_breakdown.final}")
-
-    if result.applied_rules:
-        lines.extend(["", "## Applied Custom Rules", result.applied_rules])
-
-    return "\n".join(lines).strip() + "\n"
+    return render_markdown_report("Accessibility Review Report", result)
 
 
 def review_markdown_accessibility(
@@ -69,7 +39,16 @@ def review_markdown_accessibility(
     rules_text: Optional[str],
     model: str,
     temperature: float = 0.2,
+    *,
+    path: Optional[str] = None,
+    line_numbers: Optional[List[int]] = None,
 ) -> AccessibilityReviewResponse:
+    """
+    Review Markdown text with the model.
+
+    line_numbers gives the source line of each line of markdown_text (e.g. lines added in a
+    diff); issues are anchored to these lines. Defaults to numbering the text from 1.
+    """
     if not markdown_text.strip():
         return _empty_doc_response(rules_text)
 
@@ -77,10 +56,9 @@ def review_markdown_accessibility(
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set.")
 
-    parsed = parse_markdown_structure(markdown_text)
     client = OpenAI(api_key=api_key)
 
-    user_prompt = _build_user_prompt(markdown_text, rules_text, parsed.__dict__)
+    user_prompt = build_review_prompt(markdown_text, rules_text, line_numbers)
 
     raw_text = _call_llm(
         client=client,
@@ -109,7 +87,46 @@ def review_markdown_accessibility(
     if payload is None:
         raise RuntimeError("Model response was not valid JSON after one retry.")
 
-    payload = _postprocess_payload(payload)
+    return _validate_payload(payload, path, markdown_text, line_numbers)
+
+
+def build_review_prompt(
+    markdown_text: str,
+    rules_text: Optional[str],
+    line_numbers: Optional[List[int]] = None,
+) -> str:
+    parsed = parse_markdown_structure(markdown_text, line_numbers)
+    compacted_text, compacted_lines = compact_markdown(markdown_text, line_numbers)
+    structure = {key: value for key, value in parsed.__dict__.items() if value}
+    return _build_user_prompt(number_lines(compacted_text, compacted_lines), rules_text, structure)
+
+
+def parse_review_response(
+    raw_text: str,
+    markdown_text: str,
+    *,
+    path: Optional[str] = None,
+    line_numbers: Optional[List[int]] = None,
+) -> AccessibilityReviewResponse:
+    payload = try_parse_json(raw_text)
+    if payload is None:
+        raise RuntimeError("Model response was not valid JSON.")
+    return _validate_payload(payload, path, markdown_text, line_numbers)
+
+
+def _validate_payload(
+    payload: dict,
+    path: Optional[str],
+    markdown_text: str,
+    line_numbers: Optional[List[int]],
+) -> AccessibilityReviewResponse:
+    local_issues = local_accessibility_issues(parse_markdown_structure(markdown_text, line_numbers))
+    payload = _postprocess_payload(
+        payload,
+        path,
+        resolve_line_numbers(markdown_text, line_numbers),
+        local_issues,
+    )
 
     try:
         return AccessibilityReviewResponse.model_validate(payload)
@@ -161,8 +178,10 @@ def _build_user_prompt(
                 "severity": "low|medium|high",
                 "title": "short",
                 "explanation": "1-3 educator-friendly sentences",
-                "evidence": "snippet or reference",
+                "evidence": "very short quote (max ~10 words)",
                 "suggestion": "specific actionable fix",
+                "line_start": "int, line identifier of the first affected line (e.g. 12 for L12)",
+                "line_end": "int, line identifier of the last affected line",
             }
         ],
         "applied_rules": "optional string",
@@ -173,7 +192,13 @@ def _build_user_prompt(
     return (
         "Review this Markdown document for accessibility issues. "
         "Use context-aware judgment. Missing alt text is only an issue when context suggests an informative image, "
-        "and may be acceptable if decorative and explicitly indicated or already fully described nearby.\n\n"
+        "and may be acceptable if decorative and explicitly indicated or already fully described nearby.\n"
+        "Alt text of MyST figure/image directives, and long equations with neither :alt: text nor adjacent "
+        "prose, are checked automatically; do not report those. For other long equations without :alt: text, "
+        "report one when the adjacent prose does not say what it states (a lead-in such as "
+        "'We write the Hamiltonian as:' is not a description). Long equations and code are shown as "
+        "'[... omitted ...]' placeholders that keep their label, length, whether they have alt text and "
+        "whether prose is adjacent.\n\n"
         "Tasks:\n"
         "1) Identify accessibility issues with severity\n"
         "2) Explain impact for assistive technologies and cognitive accessibility\n"
@@ -182,8 +207,9 @@ def _build_user_prompt(
         "Custom Rules (prioritize if conflicts):\n"
         f"{truncate_text(rules_section, 4000)}\n\n"
         "Extracted Markdown Structure:\n"
-        f"{json.dumps(parsed_structure, indent=2)}\n\n"
-        "Markdown Content:\n"
+        f"{json.dumps(parsed_structure)}\n\n"
+        "Markdown Content (each line is prefixed with its line identifier, e.g. L12; "
+        "cite these in line_start/line_end instead of quoting long snippets):\n"
         f"{truncate_text(markdown_text, 12000)}\n\n"
         "Return JSON EXACTLY with this shape:\n"
         f"{json.dumps(output_schema, indent=2)}\n"
@@ -191,11 +217,18 @@ def _build_user_prompt(
     )
 
 
-def _postprocess_payload(payload: dict) -> dict:
+def _postprocess_payload(
+    payload: dict,
+    path: Optional[str] = None,
+    line_numbers: Optional[List[int]] = None,
+    local_issues: Optional[List[dict]] = None,
+) -> dict:
     payload = dict(payload)
 
     if "issues" not in payload or not isinstance(payload["issues"], list):
         payload["issues"] = []
+    payload["issues"] = payload["issues"] + (local_issues or [])
+    payload["issues"] = anchor_issues(payload["issues"], path, line_numbers or [])
     payload["issues"] = normalize_issue_ids(payload["issues"])
 
     if "summary_bullets" not in payload or not isinstance(payload["summary_bullets"], list):
@@ -28,6 +28,17 @@ class AccessibilityIssue(BaseModel):
     explanation: str = Field(min_length=1)
     evidence: str = Field(min_length=1)
     suggestion: str = Field(min_length=1)
+    path: Optional[str] = None
+    line_start: Optional[int] = Field(default=None, ge=1)
+    line_end: Optional[int] = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def validate_lines(self) -> "AccessibilityIssue":
+        if self.line_start is None and self.line_end is not None:
+            raise ValueError("line_end requires line_start")
+        if self.line_start is not None and self.line_end is not None and self.line_end < self.line_start:
+            raise ValueError("line_end must not be before line_start")
+        return self
 
 
 class AccessibilityReviewResponse(BaseModel):
@@ -0,0 +1,58 @@
+from a11y_bot.utils import compact_markdown, local_accessibility_issues, parse_markdown_structure
+
+LONG_EQUATION = r"E = " + r" + ".join(rf"\frac{{a_{i}}}{{b_{i}}} x^{i}" for i in range(12))
+
+
+def test_dollar_signs_in_code_do_not_pair_with_display_math():
+    text = "\n".join(
+        [
+            "Shell scripts can print their process id.",
+            "",
+            "```bash",
+            "echo $$",
+            "```",
+            "",
+            "![](plot.png)",
+            "",
+            "For details [click here](https://example.com).",
+            "",
+            "Inline code such as `$$` or `\\begin{equation}` is not math either.",
+            "",
+            "$$",
+            LONG_EQUATION,
+            "$$",
+        ]
+    )
+
+    compacted, line_ids = compact_markdown(text)
+    equations = parse_markdown_structure(text).equations
+
+    for kept in ("echo $$", "![](plot.png)", "[click here]", "Inline code such as"):
+        assert kept in compacted
+    assert compacted.count("[display math omitted") == 1
+    assert [equation["line"] for equation in equations] == [13]
+    assert len(line_ids) == compacted.count("\n") + 1
+    assert not any(
+        issue["title"] == "Long equation without a text description"
+        for issue in local_accessibility_issues(parse_markdown_structure(text))
+    )
+
+
+def test_equation_with_only_a_lead_in_is_left_to_the_model():
+    text = "\n".join(["We write the Hamiltonian as:", "", "$$", LONG_EQUATION, "$$"])
+
+    (equation,) = parse_markdown_structure(text).equations
+    compacted, _ = compact_markdown(text)
+
+    assert not equation["has_text_alternative"]
+    assert equation["has_adjacent_prose"]
+    assert "alt text: no, adjacent prose: yes" in compacted
+    assert local_accessibility_issues(parse_markdown_structure(text)) == []
+
+
+def test_equation_without_alt_text_or_prose_is_flagged_locally():
+    text = "\n".join(["## Result", "", "$$", LONG_EQUATION, "$$"])
+
+    issues = local_accessibility_issues(parse_markdown_structure(text))
+
+    assert [issue["title"] for issue in issues] == ["Long equation without a text description"]
@@ -2,46 +2,95 @@ from __future__ import annotations
 
 import json
 import re
+from bisect import bisect_right
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 
 @dataclass
 class ParsedMarkdown:
     headings: List[Dict[str, str | int]]
-    images: List[Dict[str, str]]
-    links: List[Dict[str, str]]
-    tables: List[str]
-    code_blocks: List[Dict[str, str]]
+    images: List[Dict[str, str | int]]
+    links: List[Dict[str, str | int]]
+    tables: List[Dict[str, str | int]]
+    code_blocks: List[Dict[str, str | int]]
+    figures: List[Dict[str, str | int | bool]] = field(default_factory=list)
+    directives: List[Dict[str, str | int]] = field(default_factory=list)
+    equations: List[Dict[str, str | int | bool]] = field(default_factory=list)
 
 
 HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*$", re.MULTILINE)
 IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
 LINK_RE = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
 CODE_BLOCK_RE = re.compile(r"```([a-zA-Z0-9_-]*)\n(.*?)```", re.DOTALL)
+INLINE_CODE_RE = re.compile(r"(?<!`)(`+)(?!`)(.+?)(?<!`)\1(?!`)")
 
+# MyST directives: ```{name} argument / :::{name} argument, closed by a fence of the same length.
+DIRECTIVE_RE = re.compile(
+    r"^[ \t]*(?P<fence>`{3,}|:{3,})\{(?P<name>[^}\s]+)\}[ \t]*(?P<arg>[^\n]*)\n"
+    r"(?P<body>.*?)^[ \t]*(?P=fence)[ \t]*$",
+    re.MULTILINE | re.DOTALL,
+)
+DIRECTIVE_OPTION_RE = re.compile(r"^[ \t]*:([\w-]+):[ \t]*(.*)$")
+DISPLAY_MATH_RE = re.compile(r"\$\$(?P<body>.+?)\$\$(?:[ \t]*\((?P<label>[^)\s]+)\))?", re.DOTALL)
+LATEX_ENV_RE = re.compile(
+    r"\\begin\{(?P<env>equation|align|gather|multline|eqnarray)(?P<star>\*?)\}"
+    r"(?P<body>.*?)\\end\{(?P=env)(?P=star)\}",
+    re.DOTALL,
+)
+LATEX_LABEL_RE = re.compile(r"\\label\{([^}]+)\}")
+
+FIGURE_DIRECTIVES = {"figure", "image"}
+MATH_DIRECTIVES = {"math", "prf:equation"}
+CODE_DIRECTIVES = {"code-cell", "code", "code-block", "sourcecode"}
+
+# Equation and code bodies longer than this are replaced by a placeholder in the prompt.
+COMPACT_MIN_CHARS = 160
+
+
+@dataclass
+class _Block:
+    kind: str
+    start: int
+    end: int
+    line: int
+    info: Dict[str, str | int | bool]
+
+
+def parse_markdown_structure(
+    markdown_text: str,
+    line_numbers: Optional[List[int]] = None,
+) -> ParsedMarkdown:
+    line_of = _line_locator(markdown_text, line_numbers)
+    directive_blocks = _find_directives(markdown_text, line_of)
 
-def parse_markdown_structure(markdown_text: str) -> ParsedMarkdown:
     headings = [
-        {"level": len(m.group(1)), "text": m.group(2).strip()}
+        {"level": len(m.group(1)), "text": m.group(2).strip(), "line": line_of(m.start())}
         for m in HEADING_RE.finditer(markdown_text)
     ]
 
     images = [
-        {"alt": m.group(1).strip(), "url": m.group(2).strip()}
+        {"alt": m.group(1).strip(), "url": m.group(2).strip(), "line": line_of(m.start())}
         for m in IMAGE_RE.finditer(markdown_text)
     ]
 
     links = [
-        {"text": m.group(1).strip(), "url": m.group(2).strip()}
+        {"text": m.group(1).strip(), "url": m.group(2).strip(), "line": line_of(m.start())}
         for m in LINK_RE.finditer(markdown_text)
     ]
 
-    tables = _extract_pipe_tables(markdown_text)
+    line_ids = resolve_line_numbers(markdown_text, line_numbers)
+    tables = [
+        {"line": line_ids[min(start, len(line_ids) - 1)], "text": table}
+        for start, table in _extract_pipe_tables(markdown_text)
+    ]
 
     code_blocks = []
     for m in CODE_BLOCK_RE.finditer(markdown_text):
+        # A directive's closing fence would otherwise be mistaken for an opening one.
+        if _inside(m.start(), directive_blocks):
+            continue
         language = m.group(1).strip()
         content = m.group(2).strip()
         code_blocks.append(
@@ -49,32 +98,372 @@ def parse_markdown_structure(markdown_text: str) -> ParsedMarkdown:
                 "language": language,
                 "has_language_tag": str(bool(language)).lower(),
                 "preview": content[:180],
+                "line": line_of(m.start()),
             }
         )
 
+    figures = []
+    directives = []
+    for block in directive_blocks:
+        info = block.info
+        if info["name"] in FIGURE_DIRECTIVES:
+            figures.append(
+                {
+                    "directive": info["name"],
+                    "src": info["arg"],
+                    "alt": info["alt"],
+                    "has_alt": bool(info["alt"]),
+                    "caption": info["caption"],
+                    "has_caption": bool(info["caption"]),
+                    "label": info["label"],
+                    "line": block.line,
+                }
+            )
+        elif info["name"] in CODE_DIRECTIVES:
+            code_blocks.append(
+                {
+                    "language": info["arg"],
+                    "has_language_tag": str(bool(info["arg"])).lower(),
+                    "preview": info["body"][:180],
+                    "line": block.line,
+                }
+            )
+        elif info["name"] not in MATH_DIRECTIVES:
+            directives.append(
+                {
+                    "name": info["name"],
+                    "title": info["arg"],
+                    "label": info["label"],
+                    "body_chars": len(info["body"]),
+                    "line": block.line,
+                }
+            )
+
+    equations = [
+        {
+            "line": block.line,
+            "label": block.info["label"],
+            "chars": block.info["chars"],
+            "has_text_alternative": block.info["has_text_alternative"],
+            "has_adjacent_prose": block.info["has_adjacent_prose"],
+        }
+        for block in _find_equations(markdown_text, line_of, directive_blocks)
+    ]
+
     return ParsedMarkdown(
         headings=headings,
         images=images,
         links=links,
         tables=tables,
         code_blocks=code_blocks,
+        figures=figures,
+        directives=directives,
+        equations=equations,
+    )
+
+
+def compact_markdown(
+    markdown_text: str,
+    line_numbers: Optional[List[int]] = None,
+) -> tuple[str, List[int]]:
+    """
+    Replace long equation and code bodies with one-line placeholders for the prompt.
+
+    Placeholders keep what accessibility review needs (line, label, length, and whether an
+    equation has alt text or adjacent prose). Returns the compacted text and the source line identifier
+    of each of its lines, so line citations still point at the original file.
+    """
+    line_ids = resolve_line_numbers(markdown_text, line_numbers)
+    line_of = _line_locator(markdown_text, line_numbers)
+    directive_blocks = _find_directives(markdown_text, line_of)
+
+    blocks = [
+        block
+        for block in directive_blocks
+        if block.info["name"] in CODE_DIRECTIVES and block.end - block.start >= COMPACT_MIN_CHARS
+    ]
+    for m in CODE_BLOCK_RE.finditer(markdown_text):
+        if m.end() - m.start() >= COMPACT_MIN_CHARS and not _inside(m.start(), directive_blocks):
+            body = m.group(2)
+            blocks.append(
+                _Block(
+                    "code",
+                    m.start(),
+                    m.end(),
+                    line_of(m.start()),
+                    {"name": "code", "arg": m.group(1).strip(), "body": body},
+                )
+            )
+    blocks.extend(
+        block
+        for block in _find_equations(markdown_text, line_of, directive_blocks)
+        if block.end - block.start >= COMPACT_MIN_CHARS
     )
 
+    pieces: List[str] = []
+    new_line_ids = list(line_ids)
+    removed_lines = 0
+    cursor = 0
+    for block in sorted(blocks, key=lambda b: b.start):
+        if block.start < cursor:
+            continue
+        pieces.append(markdown_text[cursor:block.start])
+        pieces.append(_placeholder(block))
+
+        first_index = markdown_text.count("\n", 0, block.start) - removed_lines
+        merged = markdown_text.count("\n", block.start, block.end)
+        del new_line_ids[first_index + 1:first_index + 1 + merged]
+        removed_lines += merged
+        cursor = block.end
+    pieces.append(markdown_text[cursor:])
+
+    return "".join(pieces), new_line_ids
 
-def _extract_pipe_tables(markdown_text: str) -> List[str]:
+
+def local_accessibility_issues(parsed: ParsedMarkdown) -> List[dict]:
+    """Checks that need no model: figure alt text and long equations with no description at all."""
+    issues = []
+    for figure in parsed.figures:
+        if figure["has_alt"]:
+            continue
+        issues.append(
+            {
+                "severity": "medium" if figure["has_caption"] else "high",
+                "title": "Figure missing alt text",
+                "explanation": (
+                    "Screen reader users get no description of this figure. "
+                    + (
+                        "The caption helps, but it usually labels the figure rather than describing it."
+                        if figure["has_caption"]
+                        else "It also has no caption to fall back on."
+                    )
+                ),
+                "evidence": f"{{{figure['directive']}}} {figure['src']}".strip(),
+                "suggestion": "Add an :alt: option that describes what the figure shows and why it matters.",
+                "line_start": figure["line"],
+                "line_end": figure["line"],
+            }
+        )
+
+    for equation in parsed.equations:
+        # Whether adjacent prose actually describes the equation is left to the model.
+        if equation["chars"] < COMPACT_MIN_CHARS or equation["has_text_alternative"]:
+            continue
+        if equation["has_adjacent_prose"]:
+            continue
+        issues.append(
+            {
+                "severity": "low",
+                "title": "Long equation without a text description",
+                "explanation": (
+                    "Long display equations are hard to follow with a screen reader. "
+                    "A sentence explaining what the equation expresses makes it accessible."
+                ),
+                "evidence": f"Display math ({equation['chars']} chars)",
+                "suggestion": "Add a sentence directly before or after the equation describing what it states.",
+                "line_start": equation["line"],
+                "line_end": equation["line"],
+            }
+        )
+
+    for idx, issue in enumerate(issues, start=1):
+        issue["id"] = f"LOCAL-{idx}"
+    return issues
+
+
+def _find_directives(markdown_text: str, line_of) -> List[_Block]:
+    blocks = []
+    position = 0
+    while True:
+        m = DIRECTIVE_RE.search(markdown_text, position)
+        if m is None:
+            break
+        # Resume inside the body so directives nested in a longer fence are found too.
+        position = m.start("body")
+        options, body = _split_directive_options(m.group("body"))
+        name = m.group("name").strip()
+        blocks.append(
+            _Block(
+                "directive",
+                m.start(),
+                m.end(),
+                line_of(m.start()),
+                {
+                    "name": name,
+                    "arg": m.group("arg").strip(),
+                    "alt": options.get("alt", "").strip(),
+                    "label": (options.get("label") or options.get("name") or "").strip(),
+                    "caption": " ".join(body.split())[:180] if name in FIGURE_DIRECTIVES else "",
+                    "body": body.strip(),
+                },
+            )
+        )
+    return blocks
+
+
+def _split_directive_options(body: str) -> tuple[Dict[str, str], str]:
+    options: Dict[str, str] = {}
+    lines = body.split("\n")
+    i = 0
+    while i < len(lines):
+        match = DIRECTIVE_OPTION_RE.match(lines[i])
+        if not match:
+            break
+        options[match.group(1)] = match.group(2)
+        i += 1
+    return options, "\n".join(lines[i:])
+
+
+def _find_equations(markdown_text: str, line_of, directive_blocks: List[_Block]) -> List[_Block]:
+    lines = markdown_text.split("\n")
+    # "$$" and "\begin{...}" inside code are not math and must not pair with a real equation.
+    searchable = _mask_code(markdown_text, directive_blocks)
+    equations = [
+        _Block(
+            "math",
+            b.start,
+            b.end,
+            b.line,
+            {"name": b.info["name"], "label": b.info["label"], "body": b.info["body"], "alt": b.info["alt"]},
+        )
+        for b in directive_blocks
+        if b.info["name"] in MATH_DIRECTIVES
+    ]
+    taken = [(b.start, b.end) for b in equations]
+
+    candidates = []
+    for m in DISPLAY_MATH_RE.finditer(searchable):
+        body = markdown_text[m.start("body"):m.end("body")]
+        candidates.append((m.start(), m.end(), body, m.group("label") or ""))
+    for m in LATEX_ENV_RE.finditer(searchable):
+        body = markdown_text[m.start("body"):m.end("body")]
+        label = LATEX_LABEL_RE.search(body)
+        candidates.append((m.start(), m.end(), body, label.group(1) if label else ""))
+
+    for start, end, body, label in sorted(candidates):
+        if any(s <= start < e for s, e in taken):
+            continue
+        if not label:
+            inner = LATEX_LABEL_RE.search(body)
+            label = inner.group(1) if inner else ""
+        equations.append(
+            _Block("math", start, end, line_of(start), {"name": "math", "label": label, "body": body, "alt": ""})
+        )
+        taken.append((start, end))
+
+    for block in equations:
+        first = markdown_text.count("\n", 0, block.start)
+        last = markdown_text.count("\n", 0, block.end)
+        block.info["chars"] = len(block.info["body"].strip())
+        block.info["has_text_alternative"] = bool(block.info["alt"])
+        block.info["has_adjacent_prose"] = _has_adjacent_prose(lines, first, last)
+    return sorted(equations, key=lambda b: b.start)
+
+
+def _mask_code(markdown_text: str, directive_blocks: List[_Block]) -> str:
+    """Blank out code directives, fenced code and inline code spans, keeping offsets and newlines."""
+    spans = [(b.start, b.end) for b in directive_blocks if b.info["name"] in CODE_DIRECTIVES]
+    # The closing fence of a directive would otherwise be mistaken for an opening one.
+    closing_fences = [(markdown_text.rfind("\n", 0, b.end) + 1, b.end) for b in directive_blocks]
+    position = 0
+    while True:
+        m = CODE_BLOCK_RE.search(markdown_text, position)
+        if m is None:
+            break
+        fence_end = next((end for start, end in closing_fences if start <= m.start() < end), None)
+        if fence_end is not None:
+            position = fence_end
+            continue
+        spans.append((m.start(), m.end()))
+        position = m.end()
+
+    masked = _blank_spans(markdown_text, spans)
+    return _blank_spans(masked, [(m.start(), m.end()) for m in INLINE_CODE_RE.finditer(masked)])
+
+
+def _blank_spans(text: str, spans: List[tuple[int, int]]) -> str:
+    chars = list(text)
+    for start, end in spans:
+        for i in range(start, end):
+            if chars[i] != "\n":
+                chars[i] = " "
+    return "".join(chars)
+
+
+def _has_adjacent_prose(lines: List[str], first: int, last: int) -> bool:
+    """True if the nearest non-blank line before or after a block is a sentence of prose."""
+    for step, index in ((-1, first - 1), (1, last + 1)):
+        while 0 <= index < len(lines) and not lines[index].strip():
+            index += step
+        if 0 <= index < len(lines) and _is_prose(lines[index]):
+            return True
+    return False
+
+
+def _is_prose(line: str) -> bool:
+    stripped = line.strip()
+    if stripped.startswith(("$", "`", ":", "#", "|", "\\", "!", "(", "<")):
+        return False
+    return len(re.findall(r"[A-Za-z]{2,}", stripped)) >= 3
+
+
+def _placeholder(block: _Block) -> str:
+    info = block.info
+    if block.kind == "math":
+        details = [f"{info['chars']} chars"]
+        if info["label"]:
+            details.insert(0, f"label {info['label']}")
+        details.append("alt text: " + ("yes" if info["has_text_alternative"] else "no"))
+        if not info["has_text_alternative"]:
+            details.append("adjacent prose: " + ("yes" if info["has_adjacent_prose"] else "no"))
+        return f"[display math omitted: {', '.join(details)}]"
+    body = info["body"].strip()
+    line_count = body.count("\n") + 1 if body else 0
+    language = info["arg"] or "no language tag"
+    return f"[{info['name']} omitted: {language}, {line_count} lines]"
+
+
+def _inside(offset: int, blocks: List[_Block]) -> bool:
+    return any(block.start <= offset < block.end for block in blocks)
+
+
+def resolve_line_numbers(markdown_text: str, line_numbers: Optional[List[int]] = None) -> List[int]:
+    """Return the source line identifier of each line in markdown_text (1-based by default)."""
+    line_count = markdown_text.count("\n") + 1
+    if line_numbers is not None and len(line_numbers) == line_count:
+        return list(line_numbers)
+    return list(range(1, line_count + 1))
+
+
+def number_lines(markdown_text: str, line_numbers: Optional[List[int]] = None) -> str:
+    """Prefix every line with its line identifier (e.g. "L12: ") so the model can cite it."""
+    line_ids = resolve_line_numbers(markdown_text, line_numbers)
+    return "\n".join(
+        f"L{line_id}: {line}" for line_id, line in zip(line_ids, markdown_text.split("\n"))
+    )
+
+
+def _line_locator(markdown_text: str, line_numbers: Optional[List[int]]):
+    line_ids = resolve_line_numbers(markdown_text, line_numbers)
+    line_starts = [0] + [m.end() for m in re.finditer("\n", markdown_text)]
+    return lambda offset: line_ids[bisect_right(line_starts, offset) - 1]
+
+
+def _extract_pipe_tables(markdown_text: str) -> List[tuple[int, str]]:
     lines = markdown_text.splitlines()
-    tables: List[str] = []
+    tables: List[tuple[int, str]] = []
     i = 0
     while i < len(lines) - 1:
         line = lines[i]
         next_line = lines[i + 1]
         if "|" in line and _is_table_separator(next_line):
+            start = i
             buffer = [line, next_line]
             i += 2
             while i < len(lines) and "|" in lines[i].strip():
                 buffer.append(lines[i])
                 i += 1
-            tables.append("\n".join(buffer))
+            tables.append((start, "\n".join(buffer)))
         else:
             i += 1
     return tables
@@ -118,6 +507,53 @@ def normalize_issue_ids(issues: List[dict]) -> List[dict]:
     return normalized
 
 
+def anchor_issues(
+    issues: List[dict],
+    path: Optional[str],
+    line_numbers: List[int],
+) -> List[dict]:
+    """
+    Validate the line identifiers cited by the model and attach path/line_start/line_end.
+
+    Citations outside the reviewed lines are dropped rather than trusted. Issues that end up
+    with the same severity, title and anchor are collapsed into one.
+    """
+    valid_lines = set(line_numbers)
+    anchored = []
+    seen = set()
+    for issue in issues:
+        issue = dict(issue)
+        start = _parse_line_id(issue.get("line_start"))
+        end = _parse_line_id(issue.get("line_end"))
+        if start not in valid_lines:
+            start, end = None, None
+        elif end is None or end not in valid_lines or end < start:
+            end = start
+
+        issue["path"] = path
+        issue["line_start"] = start
+        issue["line_end"] = end
+
+        key = (str(issue.get("severity")), str(issue.get("title", "")).strip().lower(), start, end)
+        if start is not None and key in seen:
+            continue
+        seen.add(key)
+        anchored.append(issue)
+    return anchored
+
+
+def _parse_line_id(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*L?(\d+)\s*", value)
+        if match:
+            return int(match.group(1))
+    return None
+
+
 def ensure_score_breakdown(payload: dict) -> dict:
     severity_penalties = {"high": 15, "medium": 8, "low": 3}
     issues = payload.get("issues", []) or []